@@ -1,6 +1,6 @@
 from functions.IMPORT import *
 from functions.Scrape_and_find import scrape_and_find
-from functions.Parse_and_find import parse_and_find
+from functions.Parse_and_find import parse_and_find, is_no_answer
 from functions.Autonomous_with_tools import get_auto_assistant
 from functions.chat_management import *
 from functions.config import *
@@ -8,6 +8,8 @@ from functions.settings import *
 from functions.Personalities import load_personalities, save_personalities
 from functions.Parse_and_remember import parse_and_remember
 from functions.chat_management import save_info
+from functions.clients import get_embed_model
+from functions import fast_json
 
 session_id_global = None
 new_chat = None
@@ -19,30 +21,123 @@ save_info("N/A")
 if not os.path.exists(CHAT_DIR):
     os.mkdir(CHAT_DIR)
 os.environ["TOKENIZERS_PARALLELISM"] = "true"
-supported_extensions = [
-    '.pdf', '.doc', '.docx', '.docm', '.dot', '.dotx', '.dotm', '.rtf',
-    '.wps', '.wpd', '.sxw', '.stw', '.sxg', '.pages', '.mw', '.mcw',
-    '.uot', '.uof', '.uos', '.uop', '.ppt', '.pptx', '.pot', '.pptm',
-    '.potx', '.potm', '.key', '.odp', '.odg', '.otp', '.fopd', '.sxi',
-    '.sti', '.epub', '.html', '.htm'
-]
+# Load the embedding model in the background so the first document or web question does not wait for it
+threading.Thread(target=get_embed_model, daemon=True).start()
 
 # Path to the file
 ai_profile_pic = "assets/Ai.png"
 user_profile_pic = "assets/User.png"
 
+user_bubble_style = {'textAlign': 'left', 'padding': '10px', 'borderRadius': '10px', 'marginBottom': '10px',
+                     'maxWidth': '100%'}
+ai_bubble_style = {'textAlign': 'left', 'backgroundColor': '#f9f7f3', 'padding': '10px', 'borderRadius': '10px',
+                   'marginBottom': '10px', 'color': colors['text'], 'maxWidth': '100%'}
+
+hidden_style = {'display': 'none'}
+
+personality_update_btn_style = {
+    'width': '40%',
+    'right': '10px',
+    'backgroundColor': colors['primary'],
+    'color': 'white',
+    'borderRadius': '5px',
+    'border': 'none',
+    'marginBottom': '10px',
+    'marginRight': '80px'
+}
+
+personality_delete_btn_style = {
+    'width': '40%',
+    'right': '10px',
+    'backgroundColor': "#ca6702",
+    'color': 'white',
+    'borderRadius': '5px',
+    'border': 'none',
+    'marginBottom': '10px'
+}
+
+personality_title_style = {
+    'width': '100%',
+    'minHeight': '5px',
+    'overflowY': 'auto',
+    'borderRadius': '10px',
+    'border': f'1px solid {colors["secondary"]}',
+    'marginBottom': '15px',
+    'marginTop': '15px',
+    'font-size': '15px',
+    'padding': '5px',
+    'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)',
+    'outline': 'none',
+    ':focus': {
+        'borderColor': '#0056b3',
+        'boxShadow': '0 0 0 0.2rem rgba(0, 86, 179, 0.25)'
+    },
+    'verticalAlign': 'middle'
+}
+
+personality_description_style = {
+    'width': '100%',
+    'height': '20vh',
+    'borderRadius': '10px',
+    'border': f'1px solid {colors["secondary"]}',
+    'marginBottom': '15px',
+    'font-size': '15px',
+    'padding': '5px',
+    'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)',
+    'outline': 'none',
+    ':focus': {
+        'borderColor': '#0056b3',
+        'boxShadow': '0 0 0 0.2rem rgba(0, 86, 179, 0.25)'
+    },
+    'whiteSpace': 'pre-wrap',
+    'overflowY': 'auto',
+    'wordWrap': 'break-word'
+}
+
+new_personality_template = """Describe as precise as possible the personnality. 
+    
+    1. Define the Purpose and Role
+Identify the primary role: Determine what specific functions the AI will perform.
+Set objectives: What problems is the AI designed to solve? What are the goals of the AI's interactions?
+
+2. Establish Core Competencies
+List skills and knowledge areas: Identify the key areas of expertise the AI needs to excel in.
+Determine depth of knowledge: Decide on the level of expertise (e.g., basic, intermediate, advanced).
+
+3. Create a Personality Profile
+Traits: Define personality traits such as friendly, professional, empathetic, etc.
+Communication style: Decide on the tone and style of interaction (formal, casual, technical, etc.).
+
+4. Develop Interaction Scenarios
+Common interactions: List typical questions or tasks the AI will handle.
+Responses: Craft sample responses for these scenarios to ensure consistency in personality and competency.
+
+"""
+
+
+info_cache = {'key': None, 'info': 'N/A'}
+
 
 def read_info():
-    with open('assets/info.json', 'r') as f:
-        info = json.load(f)['info']
+    stat = os.stat('assets/info.json')
+    key = (stat.st_mtime_ns, stat.st_size)
+    if key != info_cache['key']:
+        try:
+            with open('assets/info.json', 'r') as f:
+                info_cache['info'] = fast_json.loads(f.read())['info']
+        except json.JSONDecodeError:
+            return info_cache['info']
+        info_cache['key'] = key
 
-    return info
+    return info_cache['info']
 
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP,
                                                 "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.1/css/all.min.css"],
                 suppress_callback_exceptions=True)
 
+app_settings = load_settings()
+
 app.layout = dbc.Container([
     dbc.Row([
         dbc.Col([
@@ -176,9 +271,7 @@ app.layout = dbc.Container([
                     html.Button('Upload Document', style=btn_style),
                     id='upload-data',
                     multiple=True,
-                    accept='.pdf, .doc, .docx, .docm, .dot, .dotx, .dotm, .rtf, .wps, .wpd, .sxw, .stw, .sxg, .pages, '
-                           '.mw, .mcw, .uot, .uof, .uos, .uop, .ppt, .pptx, .pot, .pptm, .potx, .potm, .key, .odp, '
-                           '.odg, .otp, .fopd, .sxi, .sti, .epub, .html, .htm',
+                    accept=', '.join(SUPPORTED_EXTENSIONS),
                     style={'marginTop': '5px'}
                 ),
                 dcc.Store(id='stored-filenames', data=[]),
@@ -217,7 +310,7 @@ app.layout = dbc.Container([
 
                 html.H6('Groq api key', style={'marginBottom': '10px'}),
 
-                dcc.Input(id='groq_api_key', value=load_settings()['groq_api_key'],
+                dcc.Input(id='groq_api_key', value=app_settings['groq_api_key'],
                           style={'width': '100%',
                                  'minHeight': '5px',
                                  'overflowY': 'auto',
@@ -235,7 +328,7 @@ app.layout = dbc.Container([
                                  'verticalAlign': 'middle', }),
                 html.H6('LlamaParse api key', style={'marginBottom': '10px'}),
 
-                dcc.Input(id='llama_parse_key', value=load_settings()['llama_parse_key'],
+                dcc.Input(id='llama_parse_key', value=app_settings['llama_parse_key'],
                           style={'width': '100%',
                                  'minHeight': '5px',
                                  'overflowY': 'auto',
@@ -255,7 +348,7 @@ app.layout = dbc.Container([
                 html.H6('Brave api key', style={'marginBottom': '10px'}),
 
                 dbc.Row([
-                    dcc.Input(id='brave_api_key', value=load_settings()['brave_api_key'],
+                    dcc.Input(id='brave_api_key', value=app_settings['brave_api_key'],
                               style={'width': '50%',
                                      'minHeight': '5px',
                                      'overflowY': 'auto',
@@ -334,9 +427,14 @@ app.layout = dbc.Container([
     [State("modal-sm", "is_open")]
 )
 def toggle_modal(n_intervals, is_open):
+    global global_info
     modal_text = read_info()
 
-    if n_intervals and modal_text != "N/A":
+    if not n_intervals or modal_text == global_info:
+        return dash.no_update, dash.no_update, dash.no_update
+    global_info = modal_text
+
+    if modal_text != "N/A":
         if modal_text == "DONE":
             return False, "Info", dbc.ModalBody()
         return True, "Info", dbc.ModalBody(modal_text)
@@ -373,31 +471,9 @@ def modify_personalities(save_clicks, delete_clicks, selected_personality, title
         button_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
     personalities = load_personalities()
-    personalities['*New Personality*'] = """Describe as precise as possible the personnality. 
-    
-    1. Define the Purpose and Role
-Identify the primary role: Determine what specific functions the AI will perform.
-Set objectives: What problems is the AI designed to solve? What are the goals of the AI's interactions?
-
-2. Establish Core Competencies
-List skills and knowledge areas: Identify the key areas of expertise the AI needs to excel in.
-Determine depth of knowledge: Decide on the level of expertise (e.g., basic, intermediate, advanced).
-
-3. Create a Personality Profile
-Traits: Define personality traits such as friendly, professional, empathetic, etc.
-Communication style: Decide on the tone and style of interaction (formal, casual, technical, etc.).
-
-4. Develop Interaction Scenarios
-Common interactions: List typical questions or tasks the AI will handle.
-Responses: Craft sample responses for these scenarios to ensure consistency in personality and competency.
-
-"""
-    try:
-        title = selected_personality
-        description = personalities[selected_personality]
-    except:
-        title = ''
-        description = ''
+    personalities['*New Personality*'] = new_personality_template
+    title = selected_personality if selected_personality in personalities else ''
+    description = personalities.get(selected_personality, '')
     if button_id == 'update-personality-btn' and title_ and description_:
         if selected_personality in personalities:
             del personalities[selected_personality]
@@ -411,60 +487,13 @@ Responses: Craft sample responses for these scenarios to ensure consistency in p
             selected_personality = None
 
     options = [{'label': key, 'value': key} for key in personalities.keys()]
-    display_btn_update = {
-        'width': '40%',
-        'right': '10px',
-        'backgroundColor': colors['primary'],
-        'color': 'white',
-        'borderRadius': '5px',
-        'border': 'none',
-        'marginBottom': '10px',
-        'marginRight': '80px'
-    } if selected_personality else {'display': 'none'}
-
-    display_btn_delete = {
-        'width': '40%',
-        'right': '10px',
-        'backgroundColor': "#ca6702",
-        'color': 'white',
-        'borderRadius': '5px',
-        'border': 'none',
-        'marginBottom': '10px'
-    } if selected_personality else {'display': 'none'}
-    title_style = {'width': '100%',
-                   'minHeight': '5px',
-                   'overflowY': 'auto',
-                   'borderRadius': '10px',
-                   'border': f'1px solid {colors["secondary"]}',
-                   'marginBottom': '15px',
-                   'marginTop': '15px',
-                   'font-size': '15px',
-                   'padding': '5px',
-                   'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)',
-                   'outline': 'none',
-                   ':focus': {
-                       'borderColor': '#0056b3',
-                       'boxShadow': '0 0 0 0.2rem rgba(0, 86, 179, 0.25)'
-                   },
-                   'verticalAlign': 'middle', } if selected_personality else {'display': 'none'}
-    description_style = {
-        'width': '100%',
-        'height': '20vh',
-        'borderRadius': '10px',
-        'border': f'1px solid {colors["secondary"]}',
-        'marginBottom': '15px',
-        'font-size': '15px',
-        'padding': '5px',
-        'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)',
-        'outline': 'none',
-        ':focus': {
-            'borderColor': '#0056b3',
-            'boxShadow': '0 0 0 0.2rem rgba(0, 86, 179, 0.25)'
-        },
-        'whiteSpace': 'pre-wrap',
-        'overflowY': 'auto',
-        'wordWrap': 'break-word'
-    } if selected_personality else {'display': 'none'}
+    if selected_personality:
+        display_btn_update = personality_update_btn_style
+        display_btn_delete = personality_delete_btn_style
+        title_style = personality_title_style
+        description_style = personality_description_style
+    else:
+        display_btn_update = display_btn_delete = title_style = description_style = hidden_style
     return (options,
             selected_personality,
             title if selected_personality else '',
@@ -509,10 +538,7 @@ def update_groq_key(button, groq, llama, brave):
 
     trigger_id = ctx.triggered[0]['prop_id'].split(".")[0]
     if trigger_id == "save-button-api":
-        update_setting('groq_api_key', groq)
-        update_setting('llama_parse_key', llama)
-        update_setting('brave_api_key', brave)
-        data = load_settings()
+        data = update_settings({'groq_api_key': groq, 'llama_parse_key': llama, 'brave_api_key': brave})
         return data['groq_api_key'], data['llama_parse_key'], data['brave_api_key']
     else:
         return dash.no_update, dash.no_update, dash.no_update
@@ -524,14 +550,7 @@ def update_groq_key(button, groq, llama, brave):
     Input('model-dropdown', 'value')
 )
 def update_max_tokens(model_name):
-    model_tokens = {
-        'mixtral-8x7b-32768': 31950,
-        'llama3-70b-8192': 8192,
-        'llama3-8b-8192': 8192,
-        'gemma-7b-it': 8192
-
-    }
-    max_tokens = model_tokens.get(model_name, 31950)
+    max_tokens = MODEL_MAX_TOKENS.get(model_name, 31950)
     marks = {5: '5 sentences max', max_tokens // 100: f'{round(max_tokens * 0.00025, 0)} pages max'}
     return max_tokens // 100, marks
 
@@ -582,6 +601,24 @@ def update_file_preview(contents, delete_clicks, send, filenames, stored_filenam
                                                                           'marginBottom': '0px'}), stored_filenames
 
 
+def file_chip(filename, delete_index=None):
+    """Icon and (shortened) name of an attached file, with a remove button when an index is given."""
+    ext = filename.rpartition('.')[2]
+    icon, color = file_icon_and_color(ext)
+    chip = [
+        html.I(className=f"fas {icon}",
+               style={'marginRight': '10px', 'color': color}),
+        html.Span(f"{filename[:6]}...{ext}" if len(filename) > 10 else filename,
+                  title=f"{filename}",
+                  style={'overflow': 'hidden', 'textOverflow': 'ellipsis', 'whiteSpace': 'nowrap'}),
+    ]
+    if delete_index is not None:
+        chip.append(html.Button('×', id={'type': 'delete-file', 'index': delete_index}, className='close',
+                                style={'fontSize': '16px', 'marginLeft': '10px', 'cursor': 'pointer',
+                                       'verticalAlign': 'middle'}))
+    return html.Div(chip, className='d-flex align-items-center', style={'marginRight': '20px'})
+
+
 @app.callback(
     Output('file-display-area', 'children'),
     [Input({'type': 'chat-session', 'index': ALL}, 'n_clicks')],
@@ -597,41 +634,22 @@ def display_session_files(n_clicks, ids):
     session_id = json.loads(button_id.split('.')[0])['index']
     session_dir = os.path.join(CHAT_DIR, session_id)
     try:
-        file_names = [file for file in os.listdir(session_dir)
-                      if not file.endswith('.json') and os.path.isfile(os.path.join(session_dir, file))]
+        with os.scandir(session_dir) as entries:
+            file_names = [entry.name for entry in entries
+                          if not entry.name.endswith('.json') and entry.name not in HIDDEN_FILES
+                          and entry.is_file()]
 
     except FileNotFoundError:
         return html.Div("")
 
-    children = [
-        html.Div([
-            html.I(className=f"fas {file_icon_and_color(filename.split('.')[-1])[0]}",
-                   style={'marginRight': '10px', 'color': file_icon_and_color(filename.split('.')[-1])[1]}),
-            html.Span(f"{filename[:6]}...{filename.split('.')[-1]}" if len(filename) > 10 else filename,
-                      title=f"{filename}",
-                      style={'overflow': 'hidden', 'textOverflow': 'ellipsis', 'whiteSpace': 'nowrap'}),
-        ], className='d-flex align-items-center', style={'marginRight': '20px'})
-        for i, filename in enumerate(file_names)
-    ]
+    children = [file_chip(filename) for filename in file_names]
 
     return html.Div(children, className='d-flex align-items-center', style={'whiteSpace': 'nowrap',
                                                                             'marginTop': '0px', 'marginBottom': '0px'})
 
 
 def generate_file_preview(filenames):
-    children = [
-        html.Div([
-            html.I(className=f"fas {file_icon_and_color(filename.split('.')[-1])[0]}",
-                   style={'marginRight': '10px', 'color': file_icon_and_color(filename.split('.')[-1])[1]}),
-            html.Span(f"{filename[:6]}...{filename.split('.')[-1]}" if len(filename) > 10 else filename,
-                      title=f"{filename}",
-                      style={'overflow': 'hidden', 'textOverflow': 'ellipsis', 'whiteSpace': 'nowrap'}),
-            html.Button('×', id={'type': 'delete-file', 'index': i}, className='close',
-                        style={'fontSize': '16px', 'marginLeft': '10px', 'cursor': 'pointer',
-                               'verticalAlign': 'middle'})
-        ], className='d-flex align-items-center', style={'marginRight': '20px'})
-        for i, filename in enumerate(filenames)
-    ]
+    children = [file_chip(filename, delete_index=i) for i, filename in enumerate(filenames)]
 
     return html.Div(children, className='d-flex align-items-center', style={'overflowX': 'auto', 'whiteSpace': 'nowrap',
                                                                             'marginTop': '0px', 'marginBottom': '0px'})
@@ -683,18 +701,18 @@ def update_chat_list(session_id, delete_clicks, ids, children):
         return new_children
 
     if session_id_global is not None and new_chat is None:
-        sessions = load_all_sessions()
-        return [create_session_div(session) for session in sessions]
+        return [create_session_div(session, last_modified) for session, last_modified in
+                load_all_sessions(with_mtime=True)]
 
     if session_id_global:
-        if children is None or session_id_global not in [child['props']['id']['index'] for child in
-                                                         children] and new_chat is not None:
+        if children is None or new_chat is not None and not any(
+                child['props']['id']['index'] == session_id_global for child in children):
             new_child = create_session_div(session_id_global)
             new_chat = None
             return children + [new_child] if children else [new_child]
     else:
-        sessions = load_all_sessions()
-        session_children = [create_session_div(session_id) for session_id in sessions]
+        session_children = [create_session_div(session_id, last_modified) for session_id, last_modified in
+                            load_all_sessions(with_mtime=True)]
         return session_children
     return children
 
@@ -792,7 +810,7 @@ def update_chat(send_clicks, new_chat_clicks, upload_contents, session_clicks,
 
         if user_input.startswith('/web'):
             save_info("Web scraping...")
-            user_input = user_input.replace("/web", "")
+            user_input = user_input[len('/web'):]
 
             ai_answer = scrape_and_find(user_input, groq_api_key, brave_id, model_dropdown, temp, max_tokens,
                                         session_id, personality_description)
@@ -802,10 +820,10 @@ def update_chat(send_clicks, new_chat_clicks, upload_contents, session_clicks,
 
         elif user_input.startswith('/data'):
             save_info("data handling")
-            user_input = user_input.replace("/data", "")
+            user_input = user_input[len('/data'):]
             directory_path = f'{CHAT_DIR}/{session_id}'
             file_paths = [os.path.join(directory_path, file_name) for file_name in os.listdir(directory_path)
-                          if any(file_name.endswith(ext) for ext in supported_extensions)]
+                          if file_name.endswith(SUPPORTED_EXTENSIONS)]
 
             ai_answer = \
                 asyncio.run(
@@ -813,7 +831,7 @@ def update_chat(send_clicks, new_chat_clicks, upload_contents, session_clicks,
                                    groq_api_key, session_id, personality_description, 3))['result']
             save_info("DONE")
 
-            if ai_answer == "N/A":
+            if is_no_answer(ai_answer):
                     ai_answer = get_auto_assistant(user_input, groq_api_key, brave_id, model_dropdown, temp, max_tokens,
                                                    file_paths, llama_parse_id, session_id, personality_description,
                                                    internet_on_off=0)
@@ -827,21 +845,12 @@ def update_chat(send_clicks, new_chat_clicks, upload_contents, session_clicks,
                     parse_and_find(file_paths, user_input, model_dropdown, llama_parse_id, temp, max_tokens,
                                    groq_api_key, session_id, personality_description, 3))[
                     'result']
-            if ai_answer == "N/A":
+            if is_no_answer(ai_answer):
                     ai_answer = get_auto_assistant(user_input, groq_api_key, brave_id, model_dropdown, temp, max_tokens,
                                                    file_paths, llama_parse_id, session_id, personality_description,
                                                    internet_on_off=0)
             filenames = filename
-            file_children = [
-                html.Div([
-                    html.I(className=f"fas {file_icon_and_color(filename.split('.')[-1])[0]}",
-                           style={'marginRight': '10px', 'color': file_icon_and_color(filename.split('.')[-1])[1]}),
-                    html.Span(f"{filename[:6]}...{filename.split('.')[-1]}" if len(filename) > 10 else filename,
-                              title=f"{filename}",
-                              style={'overflow': 'hidden', 'textOverflow': 'ellipsis', 'whiteSpace': 'nowrap'}),
-                ], className='d-flex align-items-center', style={'marginRight': '20px'})
-                for i, filename in enumerate(filenames)
-            ]
+            file_children = [file_chip(filename) for filename in filenames]
             file_children = html.Div(file_children, className='d-flex align-items-center',
                                      style={'overflowX': 'auto', 'whiteSpace': 'nowrap',
                                             'marginTop': '0px', 'marginBottom': '0px'})
@@ -850,7 +859,7 @@ def update_chat(send_clicks, new_chat_clicks, upload_contents, session_clicks,
             directory_path = f'./chat_sessions/{session_id}'
             try:
                 file_paths = [os.path.join(directory_path, file_name) for file_name in os.listdir(directory_path)
-                              if any(file_name.endswith(ext) for ext in supported_extensions)]
+                              if file_name.endswith(SUPPORTED_EXTENSIONS)]
             except:
                 file_paths = []
             ai_answer = get_auto_assistant(user_input, groq_api_key, brave_id, model_dropdown, temp, max_tokens,
@@ -878,20 +887,16 @@ def update_chat(send_clicks, new_chat_clicks, upload_contents, session_clicks,
                   {'messages': [{'role': 'assistant', 'content': 'Welcome! How can I assist you today?'}]})
         session_id = new_session_id
         new_chat = 1
-    chat_data = load_chat(session_id)
+    if 'send-button' not in button_id:
+        chat_data = load_chat(session_id)
     chat_history_elements = []
     if 'messages' not in chat_data:
         return []
     for idx, msg in enumerate(chat_data['messages']):
         if msg['role'] == 'user':
-            profile_pic = user_profile_pic
-            style = {'textAlign': 'left',
-                     'padding': '10px',
-                     'borderRadius': '10px', 'marginBottom': '10px', 'maxWidth': '100%'}
+            profile_pic, style = user_profile_pic, user_bubble_style
         else:
-            profile_pic = ai_profile_pic
-            style = {'textAlign': 'left', 'backgroundColor': '#f9f7f3', 'padding': '10px',
-                     'borderRadius': '10px', 'marginBottom': '10px', 'color': colors['text'], 'maxWidth': '100%'}
+            profile_pic, style = ai_profile_pic, ai_bubble_style
         chat_bubble = html.Div([
             html.Img(src=profile_pic, style={'width': '30px', 'height': '30px', 'borderRadius': '50%'}),
             html.Span(
@@ -936,13 +941,9 @@ def update_chat_reminder(reminder_open_button, send_button, message, groq_api_ke
     chat_history_elements = []
     for msg in chat_data['messages']:
         if msg['role'] == 'user':
-            profile_pic = user_profile_pic
-            style = {'textAlign': 'left', 'padding': '10px', 'borderRadius': '10px', 'marginBottom': '10px',
-                     'maxWidth': '100%'}
+            profile_pic, style = user_profile_pic, user_bubble_style
         else:
-            profile_pic = ai_profile_pic
-            style = {'textAlign': 'left', 'backgroundColor': '#f9f7f3', 'padding': '10px', 'borderRadius': '10px',
-                     'marginBottom': '10px', 'color': colors['text'], 'maxWidth': '100%'}
+            profile_pic, style = ai_profile_pic, ai_bubble_style
 
         chat_bubble = html.Div([
             html.Img(src=profile_pic, style={'width': '30px', 'height': '30px', 'borderRadius': '50%'}),
@@ -966,16 +967,14 @@ def update_chat_reminder(reminder_open_button, send_button, message, groq_api_ke
             html.Span(
                 [html.P(line, style={'margin': '0', 'line-height': '1.2'}) if line.strip() else html.Br() for line in
                  message.split('\n')], style={'marginLeft': '10px'})
-        ], style={'textAlign': 'left', 'padding': '10px', 'borderRadius': '10px', 'marginBottom': '10px',
-                  'maxWidth': '100%'}))
+        ], style=user_bubble_style))
 
         chat_history_elements.append(html.Div([
             html.Img(src=ai_profile_pic, style={'width': '30px', 'height': '30px', 'borderRadius': '50%'}),
             html.Span(
                 [html.P(line, style={'margin': '0', 'line-height': '1.2'}) if line.strip() else html.Br() for line in
                  ai_answer.split('\n')], style={'marginLeft': '10px'})
-        ], style={'textAlign': 'left', 'backgroundColor': '#f9f7f3', 'padding': '10px', 'borderRadius': '10px',
-                  'marginBottom': '10px', 'color': colors['text'], 'maxWidth': '100%'}))
+        ], style=ai_bubble_style))
         global_check = False
         return chat_history_elements, True
 
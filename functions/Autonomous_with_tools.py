@@ -1,28 +1,66 @@
 from functions.IMPORT import *
 from functions.Scrape_and_find import scrape_and_find
-from functions.Parse_and_find import parse_and_find
-from functions.chat_management import load_chat, save_info
+from functions.Parse_and_find import parse_and_find, is_no_answer
+from functions.chat_management import load_messages, save_info
+from functions.clients import get_groq_client
+from functions import fast_json
 
+# Upper bound on the raw document text stuffed into the fallback prompt
+MAX_CONTEXT_CHARS = 24000
 
-def get_auto_assistant(user_query, groq_api_key, brave_id, model_dropdown, temp, max_tokens, file_paths, api_key,
-                       session_id, personality, internet_on_off):
-    chat_history = load_chat(session_id)
-
-    messages = [
-        {
-            "role": "system",
-            "content": """You are an AI Assistant named 'Jacques' specialized in responding to user inquiries.
+SYSTEM_PROMPT = """You are an AI Assistant named 'Jacques' specialized in responding to user inquiries.
         Your primary objective is to respond directly and accurately using your built-in knowledge.
         Only use internet searches if the query specifically requires the most recent information or pertains to current events.
         You MUST ALWAYS reply in the user language.
 
         When responding, be concise and straightforward. Do not preface your answers with phrases like 'here is the answer' or 'according to...'.
         Avoid mentioning any underlying tools, processes, or specific names of resources used in your responses."""
+
+TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "scrape_and_find",
+        "description": "This function initiates a real-time internet search to gather and synthesize information relevant to the user's query. "
+                       "It is designed to fetch the most up-to-date data from a wide array of online sources, ensuring the assistant provides current and comprehensive answers."
+                       "Only use internet searches if the query specifically requires the most recent information or pertains to current events.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "A precise and context-rich question provided by the user, intended to be used for an exhaustive internet search. The query should include specific details and phrasing that aid in pinpointing accurate and relevant online information.",
+                }
+            },
+            "required": ["query"],
+        },
+    },
+}]
+
+
+def run_web_search(arguments, groq_api_key, brave_id, model_dropdown, temp, max_tokens, session_id, personality):
+    save_info("Scraping the web...")
+    ai_answer = scrape_and_find(arguments["query"], groq_api_key, brave_id, model_dropdown, temp, max_tokens,
+                                session_id, personality)
+    save_info("DONE")
+    return ai_answer['result']
+
+
+# Tool name -> handler, called with the parsed arguments followed by the request context
+TOOL_HANDLERS = {"scrape_and_find": run_web_search}
+
+
+def get_auto_assistant(user_query, groq_api_key, brave_id, model_dropdown, temp, max_tokens, file_paths, api_key,
+                       session_id, personality, internet_on_off):
+    chat_history = load_messages(session_id, roles=('user', 'assistant'))
+
+    messages = [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
         }
     ]
 
-    if 'messages' in chat_history:
-        messages.extend(chat_history['messages'])
+    messages.extend(chat_history)
 
     messages.append({
         "role": "user",
@@ -30,28 +68,27 @@ def get_auto_assistant(user_query, groq_api_key, brave_id, model_dropdown, temp,
     })
 
 
-    client = Groq(api_key=groq_api_key)
+    client = get_groq_client(groq_api_key)
 
     if internet_on_off == 1:
-        tools = [{
-            "type": "function",
-            "function": {
-                "name": "scrape_and_find",
-                "description": "This function initiates a real-time internet search to gather and synthesize information relevant to the user's query. "
-                               "It is designed to fetch the most up-to-date data from a wide array of online sources, ensuring the assistant provides current and comprehensive answers."
-                               "Only use internet searches if the query specifically requires the most recent information or pertains to current events.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "A precise and context-rich question provided by the user, intended to be used for an exhaustive internet search. The query should include specific details and phrasing that aid in pinpointing accurate and relevant online information.",
-                        }
-                    },
-                    "required": ["query"],
-                },
-            },
-        }]
+        tool_kwargs = {'tools': TOOLS, 'tool_choice': "auto"}
+    else:
+        tool_kwargs = {}
+
+    def handle_response(response):
+        """ Answer from the model reply, running the requested tool if any; None if it did neither. """
+        response_message = response.choices[0].message
+
+        if response_message.content:
+            save_info("DONE")
+            return response_message.content
+
+        if internet_on_off == 1 and response_message.tool_calls:
+            function = response_message.tool_calls[0].function
+            handler = TOOL_HANDLERS.get(function.name)
+            if handler is not None:
+                return handler(fast_json.loads(function.arguments), groq_api_key, brave_id, model_dropdown, temp,
+                               max_tokens, session_id, personality)
 
     async def handle_files_and_respond():
         if len(file_paths) > 0:
@@ -62,92 +99,54 @@ def get_auto_assistant(user_query, groq_api_key, brave_id, model_dropdown, temp,
                 save_info("Parsing documents...")
             retrieved_contexts = await parse_and_find(file_paths, user_query, model_dropdown, api_key, temp, max_tokens,
                                                       groq_api_key, session_id, personality, 3)
-            if retrieved_contexts['result'] != "N/A":
+            if not is_no_answer(retrieved_contexts['result']):
                 return retrieved_contexts['result']
             else:
                 save_info("It looks like it take a bit longer... Please wait :-)")
-                content = ""
+                buffer = io.StringIO()
                 for file_path in file_paths:
+                    if buffer.tell() >= MAX_CONTEXT_CHARS:
+                        break
                     pickle_file_path = f"{os.path.dirname(file_path)}/data_parse/parsed_data_{os.path.basename(file_path)}.pkl"
                     with open(pickle_file_path, 'rb') as f:
                         loaded_data = pickle.load(f)
-                        if isinstance(loaded_data, list):
-                            for item in loaded_data:
-                                content += str(item) + '\n\n'
-                        else:
-                            content += str(loaded_data) + '\n\n'
-                chat_historyy = load_chat(session_id)
-                contenu = f"""You are an AI Assistant named 'Jacques' specialized in responding to user inquiries.
-                            Your primary objective is to respond directly and accurately using your built-in knowledge.
-                            Only use internet searches if the query specifically requires the most recent information or pertains to current events.
-                            You MUST ALWAYS reply in the user language.
-                            
-                            When responding, be concise and straightforward. Do not preface your answers with phrases like 'here is the answer' or 'according to...'.
-                            Avoid mentioning any underlying tools, processes, or specific names of resources used in your responses.
-                            
-                            Below the context that the User is questionning:
-                            {content}
-                            """
-                messagess = [
-                    {
-                        "role": "system",
-                        "content": contenu
-                    }
-                ]
-
-                if 'messages' in chat_historyy:
-                    messagess.extend(chat_historyy['messages'])
-
-                messagess.append({
-                    "role": "user",
-                    "content": user_query,
-                })
-                response = client.chat.completions.create(
-                    model=model_dropdown,
-                    messages=messagess,
-                    tools=tools if internet_on_off == 1 else None,
-                    tool_choice="auto" if internet_on_off == 1 else 'none',
-                    temperature=temp
-                )
-                response_message = response.choices[0].message
-
-                if response_message.content:
-                    save_info("DONE")
-                    return response_message.content
-
-                if internet_on_off == 1 and response_message.tool_calls:
-                    tool_calls = response_message.tool_calls[0].function.name
-                    query = json.loads(response_message.tool_calls[0].function.arguments)["query"]
-                    if tool_calls == "scrape_and_find":
-                        save_info("Scraping the web...")
-                        ai_answer = scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tokens,
-                                                    session_id,
-                                                    personality)
-                        save_info("DONE")
-                        return ai_answer['result']
+                    items = loaded_data if isinstance(loaded_data, list) else [loaded_data]
+                    for item in items:
+                        buffer.write(str(item))
+                        buffer.write('\n\n')
+                        if buffer.tell() >= MAX_CONTEXT_CHARS:
+                            break
+                content = buffer.getvalue()[:MAX_CONTEXT_CHARS]
+                contenu = f"""{SYSTEM_PROMPT}
+
+        Below the context that the User is questionning:
+        {content}
+        """
+                system_message = messages[0]
+                messages[0] = {
+                    "role": "system",
+                    "content": contenu
+                }
+                try:
+                    response = client.chat.completions.create(
+                        model=model_dropdown,
+                        messages=messages,
+                        **tool_kwargs,
+                        temperature=temp
+                    )
+                finally:
+                    messages[0] = system_message
+                answer = handle_response(response)
+                if answer is not None:
+                    return answer
 
         response = client.chat.completions.create(
             model=model_dropdown,
             messages=messages,
-            tools=tools if internet_on_off == 1 else None,
-            tool_choice="auto" if internet_on_off == 1 else 'none',
+            **tool_kwargs,
             max_tokens=max_tokens,
             temperature=temp
         )
-        response_message = response.choices[0].message
-
-        if response_message.content:
-            save_info("DONE")
-            return response_message.content
-
-        if internet_on_off == 1 and response_message.tool_calls:
-            tool_calls = response_message.tool_calls[0].function.name
-            query = json.loads(response_message.tool_calls[0].function.arguments)["query"]
-            if tool_calls == "scrape_and_find":
-                save_info("Scraping the web...")
-                ai_answer = scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tokens, session_id,
-                                            personality)
-                save_info("DONE")
-                return ai_answer['result']
+        return handle_response(response)
 
     return asyncio.run(handle_files_and_respond())
@@ -1,4 +1,5 @@
 # Standard library imports
+import io
 import os
 import json
 import uuid
@@ -7,19 +8,20 @@ import shutil
 import logging
 import asyncio
 import datetime
+import functools
+import hashlib
 import pickle
+import queue
+import re
+import threading
+import time
 
 # Third-party imports
-import aiofiles
 import aiohttp
-import urllib
 import nest_asyncio
 import joblib
-import openai
 from bs4 import BeautifulSoup
 from groq import Groq
-from llama_parse import LlamaParse
-import markdown
 
 # Dash-related imports
 import dash
@@ -31,9 +33,9 @@ from dash.exceptions import PreventUpdate
 # Langchain-related imports
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.prompts import PromptTemplate
+from langchain_core.documents import Document
 from langchain.chains import RetrievalQA
 from langchain.memory import ConversationBufferMemory
 from langchain_groq import ChatGroq
 from langchain_community.embeddings.fastembed import FastEmbedEmbeddings
 from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import UnstructuredMarkdownLoader
\ No newline at end of file
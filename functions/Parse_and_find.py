@@ -1,54 +1,110 @@
 from functions.IMPORT import *
 from functions.chat_management import save_info
+from functions.documents import TEXT_SPLITTER, unique_chunks
+from functions.clients import get_embed_model, get_groq_client
+from functions import fast_json
 
 nest_asyncio.apply()
 
+NO_ANSWER_RE = re.compile(r"\s*N/A\.?\s*")
+
+
+def is_no_answer(answer):
+    """ True when the QA chain gave up, tolerating the whitespace and trailing period models add. """
+    return NO_ANSWER_RE.fullmatch(answer) is not None
+
 
 async def load_or_parse_data(file_paths, llama_parse_id, session_id):
-    parsed_data = []
+    parser = None
+    seen = set()
+    unique_paths = []
     for file_path in file_paths:
+        if file_path not in seen:
+            seen.add(file_path)
+            unique_paths.append(file_path)
+    os.makedirs(f"./chat_sessions/{session_id}/data_parse", exist_ok=True)
+
+    async def load_one(file_path):
+        nonlocal parser
         data_file = f"./chat_sessions/{session_id}/data_parse/parsed_data_{os.path.basename(file_path)}.pkl"
-        os.makedirs(f"./chat_sessions/{session_id}/data_parse", exist_ok=True)
 
-        if os.path.exists(data_file):
-            parsed_data.append(joblib.load(data_file))
-        else:
-            parsing_instruction = ("The provided document contains many tables. extract all the document, including "
-                                   "table and best keep the same format as the original document.")
+        # A cached parse is only reused if it was written after the file was last uploaded
+        if os.path.exists(data_file) and os.stat(data_file).st_mtime_ns >= os.stat(file_path).st_mtime_ns:
+            return joblib.load(data_file)
+        if parser is None:
+            # llama_parse pulls in llama_index; only import it once a file actually needs parsing
+            from llama_parse import LlamaParse
+            parsing_instruction = ("The provided document contains many tables. extract all the document, "
+                                   "including table and best keep the same format as the original document.")
             parser = LlamaParse(api_key=llama_parse_id, result_type="markdown",
                                 parsing_instruction=parsing_instruction, max_timeout=5000)
-            data = await asyncio.to_thread(parser.load_data, file_path)
-            joblib.dump(data, data_file)
-            parsed_data.append(data)
-    return parsed_data
+        data = await asyncio.to_thread(parser.load_data, file_path)
+        joblib.dump(data, data_file)
+        return data
+
+    # Each file is parsed remotely, so the uploads run side by side rather than one after the other
+    return list(await asyncio.gather(*(load_one(file_path) for file_path in unique_paths)))
+
+
 
+def file_manifest(file_paths):
+    """ Path -> (mtime, size) of the indexed files, used to tell whether the stored index is still current. """
+    manifest = {}
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        manifest[file_path] = [stat.st_mtime_ns, stat.st_size]
+    return manifest
 
 
 async def create_vector_database(file_paths, llama_parse_id, session_id):
+    persist_directory = f"./chat_sessions/{session_id}/chroma/chroma_db"
+    manifest_path = f"./chat_sessions/{session_id}/chroma/manifest.json"
+    embed_model = get_embed_model()
+
+    if os.path.exists(persist_directory):
+        vector_store = Chroma(embedding_function=embed_model, persist_directory=persist_directory,
+                              collection_name="rag")
+        try:
+            with open(manifest_path, 'r', encoding='utf8') as f:
+                indexed = fast_json.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            indexed = None
+
+        if indexed is not None:
+            # The index covers every file embedded so far in the session, not only the ones asked about now;
+            # a file only leaves it once it is gone from disk
+            current = file_manifest([path for path in indexed if os.path.exists(path)])
+            if current == indexed:
+                new_paths = [path for path in dict.fromkeys(file_paths) if path not in indexed]
+                if new_paths:
+                    documents = await load_or_parse_data(new_paths, llama_parse_id, session_id)
+                    docs = [Document(page_content=doc.text) for data in documents for doc in data]
+                    chunks = unique_chunks(TEXT_SPLITTER.split_documents(docs))
+                    if chunks:
+                        vector_store.add_documents(chunks)
+                    with open(manifest_path, 'w', encoding='utf8') as f:
+                        f.write(fast_json.dumps({**indexed, **file_manifest(new_paths)}))
+                return vector_store, embed_model
+            # An indexed file was removed or replaced: its chunks cannot be told apart, so rebuild what is left
+            file_paths = list(current) + [path for path in file_paths if path not in current]
+
+        vector_store.delete_collection()
+
     documents = await load_or_parse_data(file_paths, llama_parse_id, session_id)
-    markdown_path = f"./chat_sessions/{session_id}/data_parse/output.md"
-    with open(markdown_path, 'w', encoding='utf8') as f:
-        for data in documents:
-            for doc in data:
-                f.write(doc.text + '\n')
-
-    if not os.path.exists(markdown_path):
-        return None, None
-
-    loader = UnstructuredMarkdownLoader(markdown_path)
-    docs = loader.load()
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=100)
-    chunks = text_splitter.split_documents(docs)
-    embed_model = FastEmbedEmbeddings(model_name="BAAI/bge-base-en-v1.5")
+    docs = [Document(page_content=doc.text) for data in documents for doc in data]
+    chunks = unique_chunks(TEXT_SPLITTER.split_documents(docs))
     vector_store = Chroma.from_documents(documents=chunks, embedding=embed_model,
-                                         persist_directory=f"./chat_sessions/{session_id}/chroma/chroma_db",
+                                         persist_directory=persist_directory,
                                          collection_name="rag")
+    with open(manifest_path, 'w', encoding='utf8') as f:
+        f.write(fast_json.dumps(file_manifest(file_paths)))
     return vector_store, embed_model
 
 
-async def parse_and_find(file_paths, query, model, llama_parse_id, temp, max_tokens, groq_api_key, session_id,
-                         personality,number):
-    client = Groq(api_key=groq_api_key)
+@functools.lru_cache(maxsize=128)
+def generate_questions(query, groq_api_key):
+    """ English rephrasings of the query, memoized as the call is deterministic (temperature 0). """
+    client = get_groq_client(groq_api_key)
     chat_completion = client.chat.completions.create(
         messages=[
             {
@@ -73,21 +129,17 @@ async def parse_and_find(file_paths, query, model, llama_parse_id, temp, max_tok
         ],
         model='llama3-70b-8192',
         temperature=0,
-        max_tokens=500
+        max_tokens=500,
+        response_format={"type": "json_object"}
     )
+    return fast_json.parse_follow_up(chat_completion.choices[0].message.content)
 
-    questions = json.loads(chat_completion.choices[0].message.content)
-
-    vector_store, embed_model = await create_vector_database(file_paths, llama_parse_id, session_id)
-    vector_store = Chroma(embedding_function=embed_model,
-                          persist_directory=f"./chat_sessions/{session_id}/chroma/chroma_db", collection_name="rag")
-    retrieved_context = vector_store.as_retriever(search_kwargs={'k': number})
-
-    chat_model = ChatGroq(temperature=temp, model_name=model, api_key=groq_api_key, max_tokens=max_tokens)
-    memory = ConversationBufferMemory(memory_key='chat_history', return_messages=True, output_key='result')
 
+@functools.lru_cache(maxsize=32)
+def build_prompt_template(personality):
+    """ Document QA prompt, cached per personality since it only depends on that text. """
     if not personality:
-        prompt_template = PromptTemplate(template="""Use the following pieces of information to answer the user's question.
+        return PromptTemplate(template="""Use the following pieces of information to answer the user's question.
                                                     Context: {context}
                                                     Question: {question}
                                                     Only return the helpful answer below and nothing else.
@@ -95,9 +147,8 @@ async def parse_and_find(file_paths, query, model, llama_parse_id, temp, max_tok
                                                     If no relevant answer, YOU MUST ONLY REPLY N/A.
                                                     If you cannot successfully reply, YOU MUST ONLY REPLY N/A.
                                                     Helpful answer:""",
-                                         input_variables=['context', 'chat_history', 'question'])
+                              input_variables=['context', 'chat_history', 'question'])
     else:
-        save_info(f"Jacques will reply with the selected personality: {personality}")
         template = """Use the following pieces of information to answer the user's question.
                                                         Context: {context}
                                                         Question: {question}
@@ -108,8 +159,23 @@ async def parse_and_find(file_paths, query, model, llama_parse_id, temp, max_tok
         complete = f"""Here is the personality of the assistant to provide the answer:
                                                                             {personality}
                                                                             Helpful answer:"""
-        prompt_template = PromptTemplate(template=template + complete,
-                                         input_variables=['context', 'chat_history', 'question'])
+        return PromptTemplate(template=template + complete,
+                              input_variables=['context', 'chat_history', 'question'])
+
+
+async def parse_and_find(file_paths, query, model, llama_parse_id, temp, max_tokens, groq_api_key, session_id,
+                         personality,number):
+    questions, (vector_store, embed_model) = await asyncio.gather(
+        asyncio.to_thread(generate_questions, query, groq_api_key),
+        create_vector_database(file_paths, llama_parse_id, session_id))
+    retrieved_context = vector_store.as_retriever(search_kwargs={'k': number})
+
+    chat_model = ChatGroq(temperature=temp, model_name=model, api_key=groq_api_key, max_tokens=max_tokens)
+    memory = ConversationBufferMemory(memory_key='chat_history', return_messages=True, output_key='result')
+
+    if personality:
+        save_info(f"Jacques will reply with the selected personality: {personality}")
+    prompt_template = build_prompt_template(personality)
 
     qa_chain = RetrievalQA.from_chain_type(llm=chat_model, chain_type="stuff", retriever=retrieved_context,
                                            memory=memory,
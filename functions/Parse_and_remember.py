@@ -1,73 +1,113 @@
 from functions.IMPORT import *
 from functions.chat_management import save_info
+from functions.documents import TEXT_SPLITTER, unique_chunks
+from functions.clients import get_embed_model
+from functions import fast_json
 
 
 nest_asyncio.apply()
 
+REMINDER_SKIP_DIRS = frozenset({'chat_reminder', 'chroma'})
+
 async def load_and_combine_data(base_dir):
-    combined_data = []
+    """ One document per past discussion and per parsed upload, read straight from the session files. """
+    docs = []
 
-    for root, _, files in os.walk(f"./{base_dir}"):
+    for root, dirs, files in os.walk(f"./{base_dir}"):
+        # Vector indexes hold no reminder content, so do not descend into them
+        dirs[:] = [d for d in dirs if d not in REMINDER_SKIP_DIRS]
+        in_parse_cache = os.path.basename(root) == 'data_parse'
         for file in files:
+            ext = os.path.splitext(file)[1]
             file_path = os.path.join(root, file)
-            if "chat_reminder" in file_path:
-                continue
-            if file.endswith('.json'):
+            if ext == '.json' and not in_parse_cache:
                 try:
                     with open(file_path, 'r', encoding='utf8') as f:
-                        data = json.load(f)
+                        data = fast_json.loads(f.read())
                         messages = data.get("messages", [])
                         if messages:
                             parsed_text = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
-                            combined_data.append(f"## Discussion from {file}\n\n{parsed_text}\n")
+                            docs.append(Document(page_content=f"## Discussion from {file}\n\n{parsed_text}\n",
+                                                 metadata={'source': file_path}))
                 except (json.JSONDecodeError, KeyError, IOError) as e:
                     save_info(f"Error processing JSON file {file_path}: {e}")
-            elif file.endswith('.md'):
+            elif ext == '.pkl' and in_parse_cache and file.startswith('parsed_data_'):
+                # LlamaParse results cached by Parse_and_find: the text of the documents uploaded to the session
                 try:
-                    with open(file_path, 'r', encoding='utf8') as f:
-                        combined_data.append(f"## Discussion from {file}\n\n{f.read()}\n")
-                except IOError as e:
-                    save_info(f"Error reading markdown file {file_path}: {e}")
+                    data = joblib.load(file_path)
+                except (EOFError, IOError, pickle.UnpicklingError) as e:
+                    save_info(f"Error reading parsed document {file_path}: {e}")
+                    continue
+                items = data if isinstance(data, list) else [data]
+                parsed_text = "\n".join(item.text for item in items)
+                docs.append(Document(page_content=f"## Document {file[len('parsed_data_'):-len('.pkl')]}\n\n"
+                                                  f"{parsed_text}\n",
+                                     metadata={'source': file_path}))
 
+    return docs
 
-    chat_reminder_dir = os.path.join(f"./{base_dir}", "chat_reminder")
-    os.makedirs(chat_reminder_dir, exist_ok=True)
-    markdown_path = os.path.join(chat_reminder_dir, "combined_output.md")
-    with open(markdown_path, 'w', encoding='utf8') as f:
-        f.write("\n\n".join(combined_data))
+# Reminder stores already opened in this process, by persist directory
+reminder_stores = {}
 
-    return markdown_path
 
-async def create_vector_database(markdown_path, base_dir):
-    if not os.path.exists(markdown_path):
+async def create_vector_database(docs, base_dir):
+    if not docs:
         return None, None
 
-    loader = UnstructuredMarkdownLoader(markdown_path)
-    docs = loader.load()
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=100)
-    chunks = text_splitter.split_documents(docs)
-    embed_model = FastEmbedEmbeddings(model_name="BAAI/bge-base-en-v1.5")
+    persist_directory = os.path.join(f"./{base_dir}", "chat_reminder", "chroma", "chroma_db")
+    hash_path = os.path.join(f"./{base_dir}", "chat_reminder", "chroma", "content_hash.txt")
+    content_hash = hashlib.sha256()
+    for doc in docs:
+        content_hash.update(doc.page_content.encode('utf8'))
+        content_hash.update(b'\0')
+    content_hash = content_hash.hexdigest()
+    embed_model = get_embed_model()
+
+    if os.path.exists(persist_directory):
+        vector_store = reminder_stores.get(persist_directory)
+        if vector_store is None:
+            vector_store = Chroma(
+                embedding_function=embed_model,
+                persist_directory=persist_directory,
+                collection_name="rag"
+            )
+        try:
+            with open(hash_path, 'r') as f:
+                if f.read() == content_hash:
+                    return vector_store, embed_model
+        except FileNotFoundError:
+            pass
+        # The discussions changed: rebuild from an empty collection instead of appending to the old one
+        vector_store.delete_collection()
+
+    chunks = unique_chunks(TEXT_SPLITTER.split_documents(docs))
     vector_store = Chroma.from_documents(
         documents=chunks, embedding=embed_model,
-        persist_directory=os.path.join(f"./{base_dir}", "chat_reminder", "chroma","chroma_db"),
+        persist_directory=persist_directory,
         collection_name="rag"
     )
+    with open(hash_path, 'w') as f:
+        f.write(content_hash)
     return vector_store, embed_model
 
-async def parse_and_remember(base_dir, query, groq_api_key, global_check):
 
-    markdown_path = await load_and_combine_data(base_dir)
+async def parse_and_remember(base_dir, query, groq_api_key, global_check):
     vector_store_dir = os.path.join(f"./{base_dir}", "chat_reminder", "chroma", "chroma_db")
 
     if global_check or not os.path.exists(vector_store_dir):
-        vector_store, embed_model = await create_vector_database(markdown_path, base_dir)
+        docs = await load_and_combine_data(base_dir)
+        vector_store, embed_model = await create_vector_database(docs, base_dir)
+        reminder_stores[vector_store_dir] = vector_store
+    elif vector_store_dir in reminder_stores:
+        vector_store = reminder_stores[vector_store_dir]
     else:
-        embed_model = FastEmbedEmbeddings(model_name="BAAI/bge-base-en-v1.5")
+        embed_model = get_embed_model()
         vector_store = Chroma(
             embedding_function=embed_model,
             persist_directory=vector_store_dir,
             collection_name="rag"
         )
+        reminder_stores[vector_store_dir] = vector_store
     retrieved_context = vector_store.as_retriever(search_kwargs={'k': 8})
 
     chat_model = ChatGroq(
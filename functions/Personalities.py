@@ -1,14 +1,26 @@
 from functions.IMPORT import *
+from functions import fast_json
+
+personalities_cache = {'key': None, 'personalities': {}}
+
 
 def load_personalities():
     try:
-        with open('./assets/personalities.json', 'r') as f:
-            personalities = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        personalities = {}
-    return personalities
+        stat = os.stat('./assets/personalities.json')
+    except FileNotFoundError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    if key != personalities_cache['key']:
+        try:
+            with open('./assets/personalities.json', 'r') as f:
+                personalities = fast_json.loads(f.read())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        personalities_cache['key'] = key
+        personalities_cache['personalities'] = personalities
+    # Callers edit the dict before saving it back, so hand out a copy
+    return dict(personalities_cache['personalities'])
 
 def save_personalities(personalities):
     with open('./assets/personalities.json', 'w') as f:
         json.dump(personalities, f)
-
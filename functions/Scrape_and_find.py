@@ -1,11 +1,14 @@
 from functions.IMPORT import *
 from functions.web_scraper import process_query
 from functions.chat_management import save_info
+from functions.clients import get_groq_client
+from functions import fast_json
 
 
-def scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tokens, session_id, personality):
-    save_info("Initialization...")
-    client = Groq(api_key=groq_api_key)
+@functools.lru_cache(maxsize=128)
+def generate_questions(query, groq_api_key):
+    """ Rephrase the query; the call runs at temperature 0, so identical queries are answered from cache. """
+    client = get_groq_client(groq_api_key)
     chat_completion = client.chat.completions.create(
         messages=[
             {
@@ -30,14 +33,17 @@ def scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tok
         ],
         model='llama3-70b-8192',
         temperature=0,
-        max_tokens=500
+        max_tokens=500,
+        response_format={"type": "json_object"}
     )
+    return fast_json.parse_follow_up(chat_completion.choices[0].message.content)
 
 
-    questions = json.loads(chat_completion.choices[0].message.content)
-    retriever = asyncio.run(process_query(questions['followUp'][0], brave_id, session_id))
+@functools.lru_cache(maxsize=32)
+def build_prompt_template(personality):
+    """ Prompt for the web answer, built once per personality. """
     if not personality:
-        prompt_template = PromptTemplate(template="""Use the following pieces of information to answer the user's question. 
+        return PromptTemplate(template="""Use the following pieces of information to answer the user's question. 
                                                             Context: {context} 
 
                                                             Question: {question}
@@ -45,7 +51,7 @@ def scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tok
                                                             Do not give any information about procedures and service features that are not mentioned in the PROVIDED CONTEXT.
                                                             You MUST ALWAYS reply in the user language.
                                                             Helpful answer:""",
-                                         input_variables=['context', 'question'])
+                              input_variables=['context', 'question'])
     else:
         template = """Use the following pieces of information to answer the user's question. 
                                                                     Context: {context} 
@@ -59,8 +65,15 @@ def scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tok
         complete = f"""Here is the personality of the assistant to provide the answer:
                                                                     {personality}
                                                                     Helpful answer:"""
-        prompt_template = PromptTemplate(template=template + complete,
-                                         input_variables=['context', 'question'])
+        return PromptTemplate(template=template + complete,
+                              input_variables=['context', 'question'])
+
+
+def scrape_and_find(query, groq_api_key, brave_id, model_dropdown, temp, max_tokens, session_id, personality):
+    save_info("Initialization...")
+    questions = generate_questions(query, groq_api_key)
+    retriever = asyncio.run(process_query(questions['followUp'][0], brave_id, session_id))
+    prompt_template = build_prompt_template(personality)
 
     chat_model = ChatGroq(temperature=temp, model_name=model_dropdown,
                           api_key=groq_api_key, max_tokens=max_tokens)
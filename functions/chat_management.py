@@ -1,5 +1,6 @@
 from functions.config import *
-from functions.IMPORT import os, json, shutil, dcc, html, datetime
+from functions.IMPORT import os, json, shutil, dcc, html, datetime, queue, threading
+from functions import fast_json
 
 
 def save_chat(session_id, data, new_name=None):
@@ -7,14 +8,21 @@ def save_chat(session_id, data, new_name=None):
     original_session_dir = os.path.join(CHAT_DIR, session_id)
     original_file_path = os.path.join(original_session_dir, f"{session_id}.json")
 
+    if new_name == session_id:
+        return
+
     if new_name:
         new_session_dir = os.path.join(CHAT_DIR, new_name)
         new_file_path = os.path.join(new_session_dir, f"{new_name}.json")
 
-        if not os.path.exists(new_session_dir):
-            os.makedirs(new_session_dir)
-
-        if os.path.exists(original_session_dir):
+        if os.path.exists(original_session_dir) and not os.path.exists(new_session_dir):
+            # Move the whole directory at once, then rename only the files named after the session
+            os.rename(original_session_dir, new_session_dir)
+            for filename in os.listdir(new_session_dir):
+                if session_id in filename:
+                    os.rename(os.path.join(new_session_dir, filename),
+                              os.path.join(new_session_dir, filename.replace(session_id, new_name)))
+        elif os.path.exists(original_session_dir):
             for filename in os.listdir(original_session_dir):
                 original_file = os.path.join(original_session_dir, filename)
                 new_file = os.path.join(new_session_dir, filename.replace(session_id, new_name))
@@ -23,13 +31,15 @@ def save_chat(session_id, data, new_name=None):
             if not os.listdir(original_session_dir):
                 os.rmdir(original_session_dir)
         else:
-            with open(new_file_path, 'w') as file:
-                json.dump(data, file)
+            if not os.path.exists(new_session_dir):
+                os.makedirs(new_session_dir)
+            with open(new_file_path, 'w', encoding='utf8') as file:
+                file.write(fast_json.dumps(data))
     else:
         if not os.path.exists(original_session_dir):
             os.makedirs(original_session_dir)
-        with open(original_file_path, 'w') as file:
-            json.dump(data, file)
+        with open(original_file_path, 'w', encoding='utf8') as file:
+            file.write(fast_json.dumps(data))
 
 
 
@@ -47,39 +57,55 @@ def delete_chat(session_id):
 def load_chat(session_id):
     """ Load chat data from a JSON file within its specific session directory. """
     try:
-        with open(os.path.join(CHAT_DIR, session_id, f"{session_id}.json"), 'r') as f:
-            return json.load(f)
+        with open(os.path.join(CHAT_DIR, session_id, f"{session_id}.json"), 'r', encoding='utf8') as f:
+            return fast_json.loads(f.read())
     except FileNotFoundError:
         return []
 
 
-def load_all_sessions():
+def load_messages(session_id, roles=None):
+    """ Load the messages of a session, keeping only the given roles when provided. """
+    chat_data = load_chat(session_id)
+    if 'messages' not in chat_data:
+        return []
+    if roles is None:
+        return chat_data['messages']
+    return [msg for msg in chat_data['messages'] if msg['role'] in roles]
+
+
+def load_all_sessions(with_mtime=False):
+    """ Session ids, most recent first; as (session_id, mtime) pairs when with_mtime is set. """
     session_details = []
 
-    for session_dir in os.listdir(CHAT_DIR):
-        if 'chat_reminder' in session_dir:
-            continue
-        session_path = os.path.join(CHAT_DIR, session_dir)
-        if os.path.isdir(session_path):
-            for file in os.listdir(session_path):
-                if file.endswith('.json'):
-                    file_path = os.path.join(session_path, file)
-                    last_modified = os.path.getmtime(file_path)
-                    session_id = os.path.splitext(file)[0]
-                    session_details.append((session_id, last_modified))
+    with os.scandir(CHAT_DIR) as entries:
+        for entry in entries:
+            if 'chat_reminder' in entry.name or not entry.is_dir():
+                continue
+            # A session is a directory holding <id>/<id>.json, so stat that file instead of listing the directory
+            file_path = os.path.join(entry.path, f"{entry.name}.json")
+            try:
+                last_modified = os.path.getmtime(file_path)
+            except OSError:
+                continue
+            session_details.append((entry.name, last_modified))
 
     session_details.sort(key=lambda x: x[1], reverse=True)
+    if with_mtime:
+        return session_details
     sessions = [session[0] for session in session_details]
 
     return sessions
 
 
-def create_session_div(session_id):
+def create_session_div(session_id, last_modified_timestamp=None):
     """Helper function to create a chat session div with edit, delete, and save buttons (hidden initially)."""
 
-    file_path = os.path.join(CHAT_DIR, session_id)
-
-    last_modified_timestamp = os.path.getmtime(file_path)
+    if last_modified_timestamp is None:
+        # Same file load_all_sessions stats, so the label does not change on the next list refresh
+        try:
+            last_modified_timestamp = os.path.getmtime(os.path.join(CHAT_DIR, session_id, f"{session_id}.json"))
+        except OSError:
+            last_modified_timestamp = time.time()
     last_modified = datetime.datetime.fromtimestamp(last_modified_timestamp).strftime('%Y-%m-%d %H:%M')
 
     return html.Div(
@@ -148,10 +174,25 @@ def create_session_div(session_id):
 
 
 def file_icon_and_color(ext):
-    return ICON_MAP.get(ext, ('fa-file', '#566573'))
+    return ICON_MAP.get(ext.lower(), ('fa-file', '#566573'))
+
+
+def _write_info():
+    while True:
+        info = INFO_QUEUE.get()
+        try:
+            with open('./assets/info.json', 'w') as f:
+                json.dump({'info': info}, f)
+        except OSError as e:
+            print(f"Could not write info: {e}")
+        finally:
+            INFO_QUEUE.task_done()
+
+
+INFO_QUEUE = queue.Queue()
+threading.Thread(target=_write_info, daemon=True).start()
 
 
 def save_info(info):
-    info = {'info': info}
-    with open('./assets/info.json', 'w') as f:
-        json.dump(info, f)
+    """ Queue a status message; the file write happens on a background thread. """
+    INFO_QUEUE.put(info)
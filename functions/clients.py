@@ -0,0 +1,25 @@
+from functions.IMPORT import *
+
+EMBED_MODEL_NAME = "BAAI/bge-base-en-v1.5"
+
+embed_models = {}
+embed_model_lock = threading.Lock()
+
+
+def get_embed_model(model_name=EMBED_MODEL_NAME):
+    """ Load the embedding model on first use and share it across requests. """
+    embed_model = embed_models.get(model_name)
+    if embed_model is None:
+        # Callbacks run in threads next to the startup warm-up: only one of them may build (and download) the model
+        with embed_model_lock:
+            embed_model = embed_models.get(model_name)
+            if embed_model is None:
+                embed_model = FastEmbedEmbeddings(model_name=model_name)
+                embed_models[model_name] = embed_model
+    return embed_model
+
+
+@functools.lru_cache(maxsize=8)
+def get_groq_client(api_key):
+    """ One Groq client per API key, so its HTTP connection pool is reused between calls. """
+    return Groq(api_key=api_key)
@@ -1,5 +1,24 @@
 CHAT_DIR = './chat_sessions'
 
+# Document types that can be uploaded and parsed; also drives the upload dialog filter
+SUPPORTED_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.docm', '.dot', '.dotx', '.dotm', '.rtf',
+    '.wps', '.wpd', '.sxw', '.stw', '.sxg', '.pages', '.mw', '.mcw',
+    '.uot', '.uof', '.uos', '.uop', '.ppt', '.pptx', '.pot', '.pptm',
+    '.potx', '.potm', '.key', '.odp', '.odg', '.otp', '.fopd', '.sxi',
+    '.sti', '.epub', '.html', '.htm'
+)
+
+# OS metadata files that can land in a session folder but are not user documents
+HIDDEN_FILES = frozenset({'.DS_Store', 'Thumbs.db', 'desktop.ini'})
+
+MODEL_MAX_TOKENS = {
+    'mixtral-8x7b-32768': 31950,
+    'llama3-70b-8192': 8192,
+    'llama3-8b-8192': 8192,
+    'gemma-7b-it': 8192
+}
+
 colors = {
     'background': '#f8f9fa',
     'text': '#343a40',
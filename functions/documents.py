@@ -0,0 +1,15 @@
+from functions.IMPORT import RecursiveCharacterTextSplitter
+
+# The splitter holds no per-call state, so one instance serves every vector store
+TEXT_SPLITTER = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=100)
+
+
+def unique_chunks(chunks):
+    """ Drop chunks whose text was already seen, so repeated passages are embedded only once. """
+    seen = set()
+    unique = []
+    for chunk in chunks:
+        if chunk.page_content not in seen:
+            seen.add(chunk.page_content)
+            unique.append(chunk)
+    return unique
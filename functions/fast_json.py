@@ -0,0 +1,28 @@
+from functions.IMPORT import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """ Parse JSON with orjson when it is installed, otherwise with the standard library. """
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def dumps(obj):
+    """ Serialize to a JSON string, using orjson when it is installed. """
+    if orjson is None:
+        return json.dumps(obj)
+    return orjson.dumps(obj).decode('utf8')
+
+
+def parse_follow_up(content):
+    """ Parse a question generator reply; raise ValueError (so lru_cache keeps nothing) without 'followUp' questions. """
+    questions = loads(content)
+    if not isinstance(questions, dict) or not isinstance(questions.get('followUp'), list) or not questions['followUp']:
+        raise ValueError("Question generator returned no 'followUp' questions")
+    return questions
@@ -1,21 +1,31 @@
 from functions.IMPORT import json
+from functions import fast_json
 
 
-def update_setting(key, value):
+def update_settings(values):
     settings = load_settings()
-    settings[key] = value
+    settings.update(values)
     save_settings(settings)
+    return settings
+
+
+# Last settings read or written; every write goes through save_settings, which refreshes it
+settings_cache = {}
 
 
 def save_settings(settings):
     with open('./assets/app_settings.json', 'w') as f:
         json.dump(settings, f)
+    settings_cache['settings'] = dict(settings)
 
 
 def load_settings():
+    if 'settings' in settings_cache:
+        return dict(settings_cache['settings'])
     try:
         with open('./assets/app_settings.json', 'r') as f:
-            return json.load(f)
+            settings_cache['settings'] = fast_json.loads(f.read())
+            return dict(settings_cache['settings'])
     except FileNotFoundError:
         return {
             "groq_api_key": "",
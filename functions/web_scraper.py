@@ -1,11 +1,26 @@
 from functions.IMPORT import *
 from functions.chat_management import save_info
+from functions.documents import TEXT_SPLITTER, unique_chunks
+from functions.clients import get_embed_model
+
+# Pages are cut at this size; the article text is well within it
+MAX_PAGE_BYTES = 2_000_000
+
 
 async def fetch_page_content(session, url, timeout=800):
     try:
         async with session.get(url, timeout=timeout) as response:
             response.raise_for_status()
-            return await response.text()
+            ctype = response.headers.get('Content-Type')
+            if ctype and 'html' not in ctype:
+                return None
+            # Raw bytes: BeautifulSoup works out the encoding, including from a <meta> charset
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                body += chunk
+                if len(body) >= MAX_PAGE_BYTES:
+                    break
+            return bytes(body[:MAX_PAGE_BYTES])
     except aiohttp.ClientResponseError:
         save_info(f"Failed to fetch {url}. Status: {response.status}")
         return None
@@ -14,15 +29,30 @@ async def fetch_page_content(session, url, timeout=800):
         return None
 
 
-async def clean_and_extract_content(html):
-    soup = BeautifulSoup(html, 'html.parser')
+def clean_and_extract_content(html):
+    soup = BeautifulSoup(html, 'lxml')
     for unwanted in soup(["script", "style", "head", "nav", "footer", "iframe", "img"]):
         unwanted.decompose()
-    return ' '.join(soup.stripped_strings)
+    text = ' '.join(soup.stripped_strings)
+    # Free the parse tree now rather than keeping every page's tree alive until the batch is done
+    soup.decompose()
+    return text
+
+
 
+SEARCH_CACHE_TTL = 300
+search_cache = {}
+# Callbacks run in threads: lookups, pruning and stores on search_cache go through this lock
+search_cache_lock = threading.Lock()
 
 
 async def fetch_search_results(session, brave_id, query, results_count=10):
+    key = (query, results_count)
+    with search_cache_lock:
+        cached = search_cache.get(key)
+    if cached and time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+        return cached[1]
+
     url = f'https://api.search.brave.com/res/v1/web/search?q={query}&count={results_count}&country=fr'
     headers = {
         'Accept': 'application/json',
@@ -34,43 +64,45 @@ async def fetch_search_results(session, brave_id, query, results_count=10):
     async with session.get(url, headers=headers) as response:
         response.raise_for_status()
         json_response = await response.json()
-        return [
-            {'title': r['title'], 'link': r['url'], 'snippet': r['description']}
-            for r in json_response.get('web', {}).get('results', [])
-        ]
+    results = [
+        {'title': r['title'], 'link': r['url'], 'snippet': r['description']}
+        for r in json_response.get('web', {}).get('results', [])
+    ]
+
+    now = time.monotonic()
+    with search_cache_lock:
+        for stale in [k for k, (stamp, _) in search_cache.items() if now - stamp >= SEARCH_CACHE_TTL]:
+            del search_cache[stale]
+        search_cache[key] = (now, results)
+    return results
 
 
 async def fetch_and_process_links(session, sources):
+    seen = set()
+    unique_sources = []
+    for source in sources:
+        if source['link'] not in seen:
+            seen.add(source['link'])
+            unique_sources.append(source)
+    sources = unique_sources
     tasks = [fetch_page_content(session, source['link']) for source in sources]
     html_contents = await asyncio.gather(*tasks)
-    contents = []
-    for html, source in zip(html_contents, sources):
-        if html:
-            main_content = await clean_and_extract_content(html)
-            contents.append({**source, 'html': main_content})
-    return contents
+    fetched = [(html, source) for html, source in zip(html_contents, sources) if html]
+    # Parsing is CPU work; running it in threads lets lxml clean several pages at once
+    main_contents = await asyncio.gather(*(asyncio.to_thread(clean_and_extract_content, html)
+                                           for html, _ in fetched))
+    return [{**source, 'html': main_content} for (_, source), main_content in zip(fetched, main_contents)]
 
 
 async def create_vector_database(contents, session_id):
-    os.makedirs(f"./chat_sessions/{session_id}/data_web", exist_ok=True)
-    markdown_path = f'./chat_sessions/{session_id}/data_web/output.md'
-    with open(markdown_path, 'w', encoding='utf8') as f:
-        for content in contents:
-            if content['html']:
-                f.write(content['html'] + '\n')
-
-    if not os.path.exists(markdown_path):
-        return None, None
-
-    loader = UnstructuredMarkdownLoader(markdown_path)
     save_info("Few more steps..")
-    docs = loader.load()
+    docs = [Document(page_content=content['html'], metadata={'source': content['link']})
+            for content in contents if content['html']]
     save_info("Few more steps...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=100)
     save_info("Few more steps.")
-    chunks = text_splitter.split_documents(docs)
+    chunks = unique_chunks(TEXT_SPLITTER.split_documents(docs))
     save_info("Few more steps..")
-    embed_model = FastEmbedEmbeddings(model_name="BAAI/bge-base-en-v1.5")
+    embed_model = get_embed_model()
     save_info("Few more steps...")
     vector_store = Chroma.from_documents(documents=chunks, embedding=embed_model,
                                          persist_directory=f'./chat_sessions/{session_id}/chroma/chroma_db_2',
@@ -88,8 +120,5 @@ async def process_query(query, brave_id, session_id):
         save_info("Check coherence...")
         save_info("Few more steps.")
         vector_store, embed_model = await create_vector_database(contents, session_id)
-        vector_store = Chroma(embedding_function=embed_model,
-                              persist_directory=f'./chat_sessions/{session_id}/chroma/chroma_db_2',
-                              collection_name="rag")
         retriever = vector_store.as_retriever(search_kwargs={'k': 3})
         return retriever